@@ -9,7 +9,7 @@ import sys
 import termios
 import time
 from contextlib import suppress
-from functools import partial
+from functools import lru_cache
 from pprint import pformat
 from typing import IO, Callable, Dict, Iterator, Optional, TypeVar, NamedTuple
 
@@ -30,6 +30,7 @@ Print = Callable[..., None]
 ShortcutMap = Dict[Shortcut, str]
 
 action2key = dict()
+_load_config_cached = lru_cache(maxsize=1)(load_config)
 
 def red(x: str) -> str:
     return colored(x, 'red')
@@ -74,14 +75,12 @@ def eolnl() -> str:
 
 
 def linkAction(txt: str) -> str:
-    import kitty.utils
     # BUG: Macos cuts out #fragment for file URLs.
     # return link(kitty.utils.docs_url(f'actions#action-{txt}'), txt)
     return link(f'https://sw.kovidgoyal.net/kitty/actions/#action-{txt}', txt)
 
 
 def linkConfig(txt: str) -> str:
-    import kitty.utils
     # BUG: Macos cuts out #fragment for file URLs.
     # return link(kitty.utils.docs_url(f'conf#opt-kitty.{txt}'), txt)
     return link(f'https://sw.kovidgoyal.net/kitty/conf/#opt-kitty.{txt}', txt)
@@ -103,9 +102,7 @@ class CmdArgs:
 
     @property
     def all(self):
-        for attr in self.parts:
-            if not getattr(self, attr): return False
-        return True
+        return all(getattr(self, attr) for attr in self.parts)
 
     @all.setter
     def all(self, val):
@@ -130,88 +127,90 @@ class CmdArgs:
             self.defaults()
 
     def resolveParts(self):
-        partVals = list(getattr(self, part) for part in self.parts)
-        if any(part is True for part in partVals):
-            # If there are any TRUEs, set all NONEs to FALSE
-            for attr in self.parts:
-                if getattr(self, attr) is None: setattr(self, attr, False)
-        elif any(part is False for part in partVals):
-            # If there are any FALSEs, set all NONEs to TRUE
-            for attr in self.parts:
-                if getattr(self, attr) is None: setattr(self, attr, True)
-        else:
-            # All NONEs: set all to TRUE
-            for attr in self.parts: setattr(self, attr, True)
+        vals = {p: getattr(self, p) for p in self.parts}
+        # If there are any TRUEs, set all NONEs to FALSE,
+        # otherwise (some FALSEs or all NONEs) set all NONEs to TRUE
+        default = not any(v is True for v in vals.values())
+        for p, v in vals.items():
+            if v is None: setattr(self, p, default)
         if self.diff: self.empty = False
         if self.plain: self.links = False
         self.what = 'DIFF of' if self.diff else 'ALL'
 
 cmdArgs = CmdArgs()
 
-shortcutRe = r'^((([^ +]+)\+)*)(.*)$'
+_SHORTCUT_RE = re.compile(r'^((([^ +]+)\+)*)(.*)$')
+_ACTION_RE = re.compile(r'([^ ]+)( .*)')
+_TTY_RE = re.compile(r'^/dev/([^/]+)/([^/]+)$')
+_ANSI_RE = re.compile(r'\x1b[^m]*m')
+_DOC_TRIM_RE = re.compile(r'^[\r\n ]*|[\r\n\.].*$', re.S)
+_ISSUE_ESCAPE_RE = re.compile(r'\\(.)', re.S)
 JustFn = Callable[[int, str], str]
 def nojust(_: int, s: str): return s
 def ljust(n: int, s: str): return s.ljust(n)
 def rjust(n: int, s: str): return s.rjust(n)
 def center(n: int, s: str): return s.center(n)
-def formatConf(n: int, s: str): return linkConfig(s) + (' '*(n-len(s)))
+_SPACES = ' ' * 256
+def pad(n: int) -> str: return _SPACES[:n] if 0 < n <= len(_SPACES) else ' '*n
+def formatConf(n: int, s: str): return linkConfig(s) + pad(n-len(s))
 def formatAction(n: int, s: str):
     action, args = actionSplit(s)
-    return linkAction(action) + args + (' '*(n-len(s)))
+    return linkAction(action) + args + pad(n-len(s))
 
 class TabFmt(NamedTuple):
     indent: int = 0
     justFn: JustFn = nojust
     fmtFn: Callable[[str], str] = nofmt
 
+@lru_cache(maxsize=4096)
 def shortcutSplit(txt: str) -> tuple[str, str]:
-    global shortcutRe
-    m = re.fullmatch(shortcutRe, txt)
+    m = _SHORTCUT_RE.fullmatch(txt)
     return (m.group(1), m.group(4)) if m else ('', txt)
 
+@lru_cache(maxsize=4096)
 def actionSplit(txt: str) -> tuple[str, str]:
-    global shortcutRe
-    m = re.fullmatch(r'([^ ]+)( .*)', txt)
+    m = _ACTION_RE.fullmatch(txt)
     return (m.group(1), m.group(2)) if m else (txt, '')
 
 def shortcutFormat(mod: str, key: str) -> str:
     return yellow(mod) + green(key)
 
+@lru_cache(maxsize=4096)
 def shortcutSortKey(txt: str) -> str:
     mod, key = shortcutSplit(txt)
     return f'{key} zzz {mod}'
 
-def star(f):
-    """Parameter unpacking for lambda: https://stackoverflow.com/a/75268296/3191958"""
-    return lambda args: f(*args)
-
 def formatTable(a: list[tuple[str]], fmt: list[TabFmt]) -> list[tuple[list[tuple[str]], str]]:
-    if len(a) == 0: return []
-    field_lens = [max(map(len, aa)) for aa in zip(*a)]
-    return [(row, ''.join(list(map(star(lambda val, fmt1, width: (' '*fmt1.indent) + fmt1.fmtFn(fmt1.justFn(width, val))),
-                                   zip(row, fmt, field_lens))))) for row in a]
+    if not a: return []
+    field_lens = [0] * len(a[0])
+    for row in a:
+        for i, v in enumerate(row):
+            if len(v) > field_lens[i]: field_lens[i] = len(v)
+    out = []
+    for row in a:
+        parts = [pad(f.indent) + f.fmtFn(f.justFn(w, v)) for v, f, w in zip(row, fmt, field_lens)]
+        out.append((row, ''.join(parts)))
+    return out
 
 def printTable(a: list[list[str]], fmt: list[TabFmt], print: Print, rowFmtFn = lambda row, txt: txt) -> str:
     for row, txt in formatTable(a, fmt):
         print(rowFmtFn(row, txt))
 
 
-def print_mapping_changes(what, defns: Dict[str, str], idefns: Dict[str, str], added, removed, changed, text: str, print: Print) -> None:
-    global action2key, shortcutRe, cmdArgs
+def print_mapping_changes(what, defns: Dict[str, str], idefns: Dict[str, str], status: Dict[str, str], text: str, print: Print) -> None:
+    global action2key, cmdArgs
     printPart = getattr(cmdArgs, what)
     if printPart: print(title(text))
     table = []
-    for k in sorted([(shortcutSortKey(s), s) for s in defns]):
-        k = k[1]
-        isremoved = k in removed
-        ischanged = k in changed
-        isadded = k in added
-        flags = '  A  ' if isadded else '  C  ' if ischanged else '  -  ' if isremoved else '     '  # →
-        if cmdArgs.diff and (not isadded and not ischanged and not isremoved): continue
+    diff, show_deleted, a2k, status_get = cmdArgs.diff, cmdArgs.deleted, action2key, status.get
+    for k in sorted(defns, key=shortcutSortKey):
+        flags = status_get(k, '     ')  # →
+        if diff and k not in status: continue
+        isremoved = flags == '  -  '
         v = formatAction(0, defns[k]) if not isremoved else '     '
-        orig = f'  \t({formatAction(0, defns[k])})' if ischanged or isremoved else ''
-        if not isremoved: action2key.setdefault(re.sub(r' .*$', r'', defns[k]), []).append((k, defns[k]))
-        if isremoved and not cmdArgs.deleted: continue
+        orig = f'  \t({formatAction(0, defns[k])})' if flags in ('  C  ', '  -  ') else ''
+        if not isremoved: a2k.setdefault(defns[k].partition(' ')[0], []).append((k, defns[k]))
+        if isremoved and not show_deleted: continue
         table.append((*shortcutSplit(k), flags, v, orig))
 
     if printPart: printTable(table, [
@@ -231,9 +230,12 @@ def compare_maps(what, final: Dict[AnyEvent, str], final_kitty_mod: int, initial
     added = set(ef) - set(ei)
     removed = set(ei) - set(ef)
     changed = {k for k in set(ef) & set(ei) if ef[k] != ei[k]}
+    status = {k: '  A  ' for k in added}
+    status.update({k: '  C  ' for k in changed})
+    status.update({k: '  -  ' for k in removed})
     which = link('https://sw.kovidgoyal.net/kitty/conf/#keyboard-shortcuts', 'keyboard shortcuts') if what == 'keys' else \
             link('https://sw.kovidgoyal.net/kitty/conf/#mouse-actions', 'mouse actions')
-    print_mapping_changes(what, dict(list(ei.items()) + list(ef.items())), ei, added, removed, changed, f'{cmdArgs.what} {which}:', print)
+    print_mapping_changes(what, {**ei, **ef}, ei, status, f'{cmdArgs.what} {which}:', print)
 
 
 def flatten_sequence_map(m: SequenceMap) -> ShortcutMap:
@@ -248,20 +250,22 @@ def compare_opts(opts: KittyOpts, print: Print) -> None:
     global cmdArgs
     printConfig = print if cmdArgs.config else lambda *args, **kwargs: None
     printConfig(link('https://sw.kovidgoyal.net/kitty/conf/', f'{cmdArgs.what} config options:'))
-    default_opts = load_config()
+    default_opts = _load_config_cached()
     ignored = ('keymap', 'sequence_map', 'mousemap', 'map', 'mouse_map')
-    changed_opts = [
-        f for f in sorted(defaults._fields)
-        if f not in ignored and getattr(opts, f) != getattr(defaults, f)
-    ]
+    opts_items, default_items = opts._asdict(), defaults._asdict()
+    changed_opts = sorted(
+        f for f in default_items
+        if f not in ignored and opts_items[f] != default_items[f]
+    )
+    changed_opts_set = set(changed_opts)
     cmp_opts = changed_opts if cmdArgs.diff else default_opts
     field_len = max(map(len, cmp_opts)) if default_opts else 20
     fmt = f'{{:{field_len:d}s}}'
     colors = []
     for f in cmp_opts:
-        ischanged = f in changed_opts
+        val, default_val = opts_items[f], default_items[f]
+        ischanged = f in changed_opts_set
         flags = red('  C  ' if ischanged else '     ')
-        val = getattr(opts, f)
         if isinstance(val, dict):
             printConfig(flags, title(f'{linkConfig(f)}:'), end=' ')
             if f == 'symbol_map':
@@ -275,15 +279,14 @@ def compare_opts(opts: KittyOpts, print: Print) -> None:
             else:
                 printConfig(pformat(val))
         else:
-            val = getattr(opts, f)
             if isinstance(val, Color):
                 colors.append(flags + ' ' + yellow(fmt.format(f)) + ' ' + color_as_sharp(val) + ' ' + styled('  ', bg=val))
             else:
                 if f == 'kitty_mod':
-                    printConfig(flags, yellow(formatConf(field_len, f)), '+'.join(mod_to_names(getattr(opts, f))), end='')
+                    printConfig(flags, yellow(formatConf(field_len, f)), '+'.join(mod_to_names(val)), end='')
                 else:
-                    printConfig(flags, yellow(formatConf(field_len, f)), str(getattr(opts, f)), end='')
-                printConfig(dim(f'  \t({str(getattr(defaults, f))})') if ischanged else '')
+                    printConfig(flags, yellow(formatConf(field_len, f)), str(val), end='')
+                printConfig(dim(f'  \t({default_val})') if ischanged else '')
 
     compare_maps('mouse', opts.mousemap, opts.kitty_mod, default_opts.mousemap, default_opts.kitty_mod, print)
 
@@ -336,30 +339,18 @@ class IssueData:
             return char
 
     def parse_issue_file(self, issue_file: IO[str]) -> Iterator[str]:
-        last_char: Optional[str] = None
-        while True:
-            this_char = issue_file.read(1)
-            if not this_char:
-                break
-            if last_char == '\\':
-                yield self.translate_issue_char(this_char)
-            elif last_char is not None:
-                yield last_char
-            # `\\\a` should not match the last two slashes,
-            # so make it look like it was `\?\a` where `?`
-            # is some character other than `\`.
-            last_char = None if last_char == '\\' else this_char
-        if last_char is not None:
-            yield last_char
+        # `\\\a` should not match the last two slashes: the regex consumes
+        # escapes left to right, so `\\` becomes `\` before `\a` is seen.
+        return iter([_ISSUE_ESCAPE_RE.sub(lambda m: self.translate_issue_char(m.group(1)), issue_file.read())])
 
 
 def format_tty_name(raw: str) -> str:
-    return re.sub(r'^/dev/([^/]+)/([^/]+)$', r'\1\2', raw)
+    return _TTY_RE.sub(r'\1\2', raw)
 
 
+@lru_cache(maxsize=1)
 def getActions():
-    import inspect
-    import re
+    from inspect import isfunction
     # occurences of fgrep '@ac':
     from kitty.window import Window
     from kitty.tabs import Tab
@@ -371,25 +362,25 @@ def getActions():
 
     return [v[1:] for v in sorted([
         (order.get(v.action_spec.group, v.action_spec.group),
-            v.action_spec.group, k, re.sub(r'^[\r\n ]*|[\r\n\.].*$', r'', v.action_spec.doc, 0, re.S))
+            v.action_spec.group, k, _DOC_TRIM_RE.sub('', v.action_spec.doc))
         for c in [Window, Tab, Boss]
         for k, v in c.__dict__.items()
-        if inspect.isfunction(v) and hasattr(v, 'action_spec')
+        if isfunction(v) and hasattr(v, 'action_spec')
     ])]
 
 
 def printActions(print: Print):
-    global shortcutRe, cmdArgs
+    global cmdArgs
     actionsTable = formatTable(getActions(), [
         TabFmt(justFn=ljust, fmtFn=blue),
         TabFmt(justFn=formatAction, indent=2),
         TabFmt(fmtFn=dim, indent=3)])
     for (group, action, desc), rowTxt in actionsTable:
         if cmdArgs.empty: print(rowTxt)
-        a = re.sub(r' .*$', r'', action)
+        a = action.partition(' ')[0]
         if a in action2key:
             if not cmdArgs.empty: print(rowTxt)
-            a2ksorted = [v[1] for v in sorted([((v, shortcutSortKey(k)), (k,v)) for k, v in action2key[a]])]
+            a2ksorted = sorted(action2key[a], key=lambda kv: (kv[1], shortcutSortKey(kv[0])))
             a2ksimple = [v for v in a2ksorted if v[1] == a]
             a2kcomposite = [v for v in a2ksorted if v[1] != a]
             if len(a2ksimple) > 0:
@@ -407,11 +398,15 @@ def printActions(print: Print):
                 ], print=print)
 
 
-def debug_config(opts: KittyOpts) -> str:
+def debug_config(opts: KittyOpts, sink: Optional[IO[str]] = None) -> str:
     global cmdArgs
-    from io import StringIO
-    out = StringIO()
-    p = partial(print, file=out, end=eolnl())
+    buf: list[str] = []
+    write = buf.append if sink is None else sink.write
+    plain = cmdArgs.plain
+
+    def p(*args, sep=' ', end=eolnl()):
+        s = sep.join(map(str, args)) + end
+        write(_ANSI_RE.sub('', s) if plain else s)
 
     if cmdArgs.info:
         p(version(add_rev=True))
@@ -469,12 +464,13 @@ def debug_config(opts: KittyOpts) -> str:
         p(green(link('https://sw.kovidgoyal.net/kitty/actions/', f'{cmdArgs.what} available actions:')))
         printActions(p)
 
-    return out.getvalue() if not cmdArgs.plain else re.sub(r'\x1b[^m]*m', '', out.getvalue())
+    return ''.join(buf)
 
 
 def parseArgs(args):
     global cmdArgs
     import argparse
+    for fn in (shortcutSplit, actionSplit, shortcutSortKey): fn.cache_clear()
     parser = argparse.ArgumentParser(
         prog=f'kitty +kitten {args[0]}',
         usage=f'kitty +kitten {args[0]} [options]',
@@ -509,7 +505,8 @@ def parseArgs(args):
 
 def main(args) -> str:
     parseArgs(args)
-    print(debug_config(create_default_opts()))
+    debug_config(create_default_opts(), sys.stdout)
+    print()
 
 from kittens.tui.handler import result_handler
 @result_handler(no_ui=True)